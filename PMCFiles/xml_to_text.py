@@ -15,21 +15,117 @@ The script extracts:
 Each output .txt file is named after the PMCID (or original filename stem)
 and placed in --dest. Existing files are overwritten.
 
-This is intentionally lightweight (stdlib only) so it runs without extra deps.
+This is intentionally lightweight: lxml is used when installed (faster parsing
+and compiled XPath), otherwise it falls back to the stdlib ElementTree.
 Refinements (future): figure/legend capture, table text, keyword list, refs.
 """
 
 from __future__ import annotations
 
 import argparse
+import os
 import re
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-import xml.etree.ElementTree as ET
+from typing import Iterator
+
+try:  # prefer lxml (libxml2-backed) when available
+    from lxml import etree as ET
+
+    _HAVE_LXML = True
+except ImportError:  # pragma: no cover - stdlib fallback
+    import xml.etree.ElementTree as ET
+
+    _HAVE_LXML = False
+
+
+def _xpath(path: str):
+    """Return a callable evaluating ``path`` against an element.
+
+    Uses a compiled lxml XPath when available, else ElementPath ``findall``.
+    """
+    if _HAVE_LXML:
+        return ET.XPath(path)
+    return lambda el: el.findall(path)
+
+
+def _xpath_first(path: str):
+    """Like `_xpath` but the callable returns the first match (or None)."""
+    if _HAVE_LXML:
+        xp = ET.XPath(f'({path})[1]')
+        return lambda el: next(iter(xp(el)), None)
+    return lambda el: el.find(path)
+
+
+# Compiled once at import instead of re-parsing the path on every lookup
+_PARA_XP = _xpath('.//p')
+_FIRST_LABEL_XP = _xpath_first('.//label')
+_FIRST_CAPTION_XP = _xpath_first('.//caption')
+_FIRST_TITLE_XP = _xpath_first('.//title')
+_FIRST_TABLE_XP = _xpath_first('.//table')
+
+_BLANK_RE = re.compile(r"\n{3,}")
+_PMCID_RE = re.compile(r'(PMC\d+)')
+
+_WRITE_BUFFER = 128 * 1024
+
+# Process umask (only readable by setting it), for output file permissions
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+_TABLE_TAGS = frozenset(('table-wrap', 'table'))
+_CELL_TAGS = frozenset(('td', 'th'))
+
+# Elements whose iterparse end events are handled (only top-level sections of
+# the first <body> are rendered; <body> marks where those end).
+_UNIT_TAGS = frozenset(('article-title', 'article-id', 'abstract', 'sec', 'body'))
+
+# Ancestors whose content is rendered when they end, so must stay intact
+_PENDING_TAGS = ('abstract', 'body')
+
+# Ancestors of the article's own title (reference lists have many more titles)
+_MAIN_TITLE_PATH = ('front', 'article-meta', 'title-group')
+
+# Image-only abstracts carry no usable text (typically just "Graphical abstract")
+_SKIP_ABSTRACT_TYPES = frozenset(('graphical', 'graphical-abstract'))
+
+# Comments/PIs are dropped so child iteration only sees elements (matches
+# stdlib behaviour). Blank text is kept: it can be significant in mixed content.
+_ITERPARSE_KW = (
+    {'huge_tree': True, 'remove_comments': True, 'remove_pis': True}
+    if _HAVE_LXML
+    else {}
+)
+
+
+def _space_superscripts(el: ET.Element) -> None:
+    """Prefix the text of every <sup> below el with a space.
+
+    Text is gathered with itertext() and joined without separators, which
+    would otherwise read 10<sup>5</sup> as "105"; this keeps it "10 5" in
+    titles, abstracts, paragraphs and table cells alike.
+    """
+    for sup in el.iter('sup'):
+        sup.text = ' ' + sup.text if sup.text else ' '
+
+
+def _outer_tables(el: ET.Element) -> Iterator[ET.Element]:
+    """Yield the outermost table-wrap/table elements below el in document order.
+
+    A single walk that does not descend into the tables it yields, so a table
+    inside a table-wrap isn't reported (and extracted) a second time.
+    """
+    for sub in el:
+        if sub.tag in _TABLE_TAGS:
+            yield sub
+        else:
+            yield from _outer_tables(sub)
 
 
 def clean_cell(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip()
+    return " ".join(text.split())
 
 
 def extract_table(el: ET.Element, table_format: str = "markdown") -> list[str]:
@@ -39,27 +135,28 @@ def extract_table(el: ET.Element, table_format: str = "markdown") -> list[str]:
     """
     # Inside table-wrap there may be a label, caption and the table element
     caption_parts = []
-    label_el = el.find('.//label')
+    label_el = _FIRST_LABEL_XP(el)
     if label_el is not None and label_el.text:
         caption_parts.append(clean_cell("".join(label_el.itertext())))
-    cap_el = el.find('.//caption')
+    cap_el = _FIRST_CAPTION_XP(el)
     if cap_el is not None:
         # Prefer title inside caption if present
-        title_el = cap_el.find('.//title')
+        title_el = _FIRST_TITLE_XP(cap_el)
         if title_el is not None:
             caption_parts.append(clean_cell("".join(title_el.itertext())))
         else:
             caption_parts.append(clean_cell("".join(cap_el.itertext())))
 
-    table_node = el.find('.//table') if el.tag != 'table' else el
+    table_node = _FIRST_TABLE_XP(el) if el.tag != 'table' else el
     if table_node is None:
         return []
 
     def row_cells(tr: ET.Element) -> list[str]:
         cells = []
-        for cell in list(tr):
-            if cell.tag in {"td", "th"}:
-                cells.append(clean_cell("".join(cell.itertext())))
+        for cell in tr:
+            if cell.tag in _CELL_TAGS:
+                # clean_cell inlined: this runs for every cell of every table
+                cells.append(" ".join("".join(cell.itertext()).split()))
         # filter trailing empty cells
         while cells and not cells[-1]:
             cells.pop()
@@ -110,115 +207,259 @@ def extract_table(el: ET.Element, table_format: str = "markdown") -> list[str]:
     return lines
 
 
-def extract_text(xml_path: Path, table_format: str = "markdown") -> str:
-    tree = ET.parse(xml_path)
-    root = tree.getroot()
+def _iter_unit_ends(xml_path: Path):
+    """Return (elements, getparent) for the end events of _UNIT_TAGS.
 
-    # Helper to get concatenated text content of an element
-    def text_of(el):
-        return "".join(el.itertext()).strip()
+    With lxml this is a tag-filtered iterparse, so other elements never reach
+    Python. The stdlib fallback parses the whole tree and replays the same
+    post-order with a parent map.
+    """
+    if _HAVE_LXML:
+        events = ET.iterparse(
+            str(xml_path), events=('end',), tag=tuple(_UNIT_TAGS), **_ITERPARSE_KW
+        )
+        return (elem for _, elem in events), ET._Element.getparent
 
-    lines: list[str] = []
+    root = ET.parse(xml_path).getroot()
+    parents = {child: parent for parent in root.iter() for child in parent}
+
+    def post_order(el):
+        for child in el:
+            yield from post_order(child)
+        if el.tag in _UNIT_TAGS:
+            yield el
+
+    return post_order(root), parents.get
+
+
+def _is_main_title(elem: ET.Element, getparent) -> bool:
+    """True for the article-title under front/article-meta/title-group."""
+    for tag in reversed(_MAIN_TITLE_PATH):
+        elem = getparent(elem)
+        if elem is None or elem.tag != tag:
+            return False
+    return True
 
-    # Title
-    titles = [text_of(t) for t in root.findall('.//article-title')]
-    if titles:
-        main_title = max(titles, key=len)
-        lines.append(f"Title: {main_title}")
 
-    # DOI
-    dois = [t.text.strip() for t in root.findall('.//article-id[@pub-id-type="doi"]') if t.text]
-    if dois:
-        lines.append(f"DOI: {dois[0]}")
+def _inside_pending(elem: ET.Element) -> bool:
+    """True if an ancestor (abstract/body) will still be rendered as a whole."""
+    if not _HAVE_LXML:
+        return True  # the stdlib fallback keeps the full tree anyway
+    return next(elem.iterancestors(*_PENDING_TAGS), None) is not None
 
-    # PMCID
-    pmcids = [t.text.strip() for t in root.findall('.//article-id[@pub-id-type="pmcid"]') if t.text]
-    if pmcids:
-        lines.append(f"PMCID: {pmcids[0]}")
 
-    # Abstract(s)
-    abstracts = root.findall('.//abstract')
-    for idx, abs_el in enumerate(abstracts, start=1):
+def _release(elem: ET.Element) -> None:
+    """Free a handled element and its already processed siblings (lxml only)."""
+    if not _HAVE_LXML:
+        return
+    elem.clear()
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
+
+
+def iter_blocks(xml_path: Path, table_format: str = "markdown") -> Iterator[str]:
+    """Yield the article's text blocks in output order (empty blocks skipped).
+
+    Blocks are meant to be separated by a single blank line; see extract_text.
+    """
+    # Helper to get concatenated text content of an element
+    def text_of(el):
+        return "".join(el.itertext()).strip()
+
+    main_title: str | None = None
+    titles: list[str] = []  # fallback candidates when there's no front title
+    doi: str | None = None
+    pmcid: str | None = None
+    abstract_lines: list[str] = []
+    body_lines: list[str] = []
+
+    def add_abstract(abs_el: ET.Element, idx: int):
         # Skip graphical or other non-text heavy abstracts by checking for paragraphs
-        paras = [text_of(p) for p in abs_el.findall('.//p')]
+        paras = [text_of(p) for p in _PARA_XP(abs_el)]
         if not paras:
             # fallback to whole abstract text
             raw = text_of(abs_el)
             if raw:
-                lines.append(f"Abstract {idx}:\n{raw}")
+                abstract_lines.append(f"Abstract {idx}:\n{raw}")
         else:
-            lines.append(f"Abstract {idx}:")
+            abstract_lines.append(f"Abstract {idx}:")
             for p in paras:
                 if p:
-                    lines.append(p)
-
-    # Body sections with inline table handling
-    body = root.find('.//body')
-    if body is not None:
-        # Depth-first over sections to keep original order
-        def paragraph_non_table_text(p: ET.Element) -> str:
-            parts: list[str] = []
-            if p.text:
-                parts.append(p.text)
-            for sub in p:
-                if sub.tag in {'table-wrap', 'table'}:
-                    # skip its internal text (will be extracted separately) but keep its tail
-                    if sub.tail:
-                        parts.append(sub.tail)
+                    abstract_lines.append(p)
+
+    # Depth-first over sections to keep original order
+    def paragraph_non_table_text(p: ET.Element) -> str:
+        parts: list[str] = []
+        if p.text:
+            parts.append(p.text)
+        for sub in p:
+            if sub.tag in _TABLE_TAGS:
+                # skip its internal text (will be extracted separately) but keep
+                # its tail, still separated from the preceding text
+                parts.append(" ")
+            else:
+                parts.append("".join(sub.itertext()))
+            if sub.tail:
+                parts.append(sub.tail)
+        # single join, then normalize whitespace
+        return " ".join("".join(parts).split())
+
+    def walk_sec(sec: ET.Element):
+        title_el = sec.find('title')
+        if title_el is not None:
+            title_text = text_of(title_el)
+            if title_text:
+                body_lines.append(f"## {title_text}")
+        for child in sec:
+            tag = child.tag
+            if tag == 'title':
+                continue
+            if tag == 'p':
+                # extract nested tables first
+                nested_tables = list(_outer_tables(child))
+                p_txt = paragraph_non_table_text(child)
+                if p_txt:
+                    body_lines.append(p_txt)
+                for nt in nested_tables:
+                    body_lines.extend(extract_table(nt, table_format))
+            elif tag in _TABLE_TAGS:
+                body_lines.extend(extract_table(child, table_format))
+            elif tag == 'sec':
+                walk_sec(child)
+
+    # Single pass over the end events of the unit tags only; each handled unit
+    # is cleared afterwards unless an enclosing unit still needs it.
+    n_abstracts = 0
+    body_done = False  # first <body> ended; its top-level secs all came before
+    events, getparent = _iter_unit_ends(xml_path)
+    for elem in events:
+        tag = elem.tag
+        if tag == 'article-title':
+            if main_title is None:
+                _space_superscripts(elem)
+                if _is_main_title(elem, getparent):
+                    main_title = text_of(elem)
                 else:
-                    parts.append("".join(sub.itertext()))
-                    if sub.tail:
-                        parts.append(sub.tail)
-            text = " ".join(s.strip() for s in parts if s and s.strip())
-            # normalize whitespace
-            return re.sub(r"\s+", " ", text).strip()
-
-        def walk_sec(sec: ET.Element):
-            title_el = sec.find('title')
-            if title_el is not None:
-                title_text = text_of(title_el)
-                if title_text:
-                    lines.append(f"## {title_text}")
-            for child in list(sec):
-                tag = child.tag
-                if tag == 'title':
-                    continue
-                if tag == 'p':
-                    # extract nested tables first
-                    nested_tables = child.findall('.//table-wrap') + child.findall('.//table')
-                    p_txt = paragraph_non_table_text(child)
-                    if p_txt:
-                        lines.append(p_txt)
-                    for nt in nested_tables:
-                        lines.extend(extract_table(nt, table_format))
-                elif tag in {'table-wrap', 'table'}:
-                    lines.extend(extract_table(child, table_format))
-                elif tag == 'sec':
-                    walk_sec(child)
-        for top_sec in body.findall('sec'):
-            walk_sec(top_sec)
-
-    content = "\n\n".join(lines).strip() + "\n"
-
-    # Basic cleanup: collapse excessive blank lines
-    content = re.sub(r"\n{3,}", "\n\n", content)
-    return content
+                    titles.append(text_of(elem))
+        elif tag == 'article-id':
+            # ids are plain text nodes; the first of each type wins
+            id_type = elem.get('pub-id-type')
+            if elem.text and id_type == 'doi' and doi is None:
+                doi = elem.text.strip()
+            elif elem.text and id_type == 'pmcid' and pmcid is None:
+                pmcid = elem.text.strip()
+        elif tag == 'abstract':
+            # Image-only abstracts are skipped
+            if elem.get('abstract-type') not in _SKIP_ABSTRACT_TYPES:
+                n_abstracts += 1
+                _space_superscripts(elem)
+                add_abstract(elem, n_abstracts)
+        elif tag == 'sec':
+            parent = getparent(elem)
+            if body_done or parent is None or parent.tag != 'body':
+                # nested or non-body section: rendered (or ignored) with its
+                # ancestor, so it must stay intact
+                continue
+            _space_superscripts(elem)
+            walk_sec(elem)
+            _release(elem)
+            continue
+        elif tag == 'body':
+            body_done = True
+
+        if not _inside_pending(elem):
+            _release(elem)
+
+    # Without a front-matter title, fall back to the longest one seen anywhere
+    # (only known at the end)
+    header: list[str] = []
+    if main_title is None and titles:
+        main_title = max(titles, key=len)
+    if main_title is not None:
+        header.append(f"Title: {main_title}")
+    if doi is not None:
+        header.append(f"DOI: {doi}")
+    if pmcid is not None:
+        header.append(f"PMCID: {pmcid}")
+
+    for lines in (header, abstract_lines, body_lines):
+        for block in lines:
+            # Empty entries (e.g. after tables) would only add blank lines
+            if block:
+                # Basic cleanup: collapse excessive blank lines
+                yield _BLANK_RE.sub("\n\n", block)
+
+
+def extract_text(xml_path: Path, table_format: str = "markdown") -> str:
+    return "\n\n".join(iter_blocks(xml_path, table_format)).strip() + "\n"
+
+
+def _output_name(xml_file: Path) -> str:
+    pmcid_match = _PMCID_RE.search(xml_file.stem)
+    return (pmcid_match.group(1) if pmcid_match else xml_file.stem) + '.txt'
+
+
+def _convert_one(xml_file: Path, out_path: Path, table_format: str) -> None:
+    # Write blocks as they are produced instead of joining the whole document.
+    # They go to a private temp file that only replaces the output once
+    # conversion succeeded, so a failed re-run keeps the previous good file.
+    tmp = tempfile.NamedTemporaryFile(
+        dir=out_path.parent, prefix=out_path.name + '.', suffix='.tmp',
+        delete=False, buffering=_WRITE_BUFFER,
+    )
+    try:
+        with tmp as f:
+            sep = b''
+            for block in iter_blocks(xml_file, table_format=table_format):
+                f.write(sep)
+                f.write(block.encode('utf-8'))
+                sep = b'\n\n'
+            f.write(b'\n')
+        # mkstemp files are 0600; give the output the usual umask-based mode
+        os.chmod(tmp.name, 0o666 & ~_UMASK)
+        os.replace(tmp.name, out_path)
+    except Exception as e:  # noqa: BLE001
+        Path(tmp.name).unlink(missing_ok=True)
+        # lxml parse errors can't be pickled back to the parent process
+        raise RuntimeError(str(e)) from None
 
 
 def process_dir(source: Path, dest: Path, table_format: str) -> int:
     dest.mkdir(parents=True, exist_ok=True)
-    count = 0
+    # Several inputs can map to one output (PMC123.xml, PMC123_v2.xml); keep
+    # the last in sorted order rather than have them overwrite each other
+    jobs: dict[Path, Path] = {}
     for xml_file in sorted(source.glob('*.xml')):
-        try:
-            txt = extract_text(xml_file, table_format=table_format)
-        except Exception as e:  # noqa: BLE001
-            print(f"[WARN] Failed to parse {xml_file.name}: {e}", file=sys.stderr)
-            continue
-        # Derive output name
-        pmcid_match = re.search(r'(PMC\d+)', xml_file.stem)
-        out_name = (pmcid_match.group(1) if pmcid_match else xml_file.stem) + '.txt'
-        (dest / out_name).write_text(txt, encoding='utf-8')
-        count += 1
+        out_path = dest / _output_name(xml_file)
+        if out_path in jobs:
+            print(f"[WARN] Skipping {jobs[out_path].name}: {xml_file.name} "
+                  f"also maps to {out_path.name}", file=sys.stderr)
+        jobs[out_path] = xml_file
+    count = 0
+    # Small batches don't amortize process pool startup; convert them inline
+    if len(jobs) < 4:
+        for out_path, xml_file in jobs.items():
+            try:
+                _convert_one(xml_file, out_path, table_format)
+            except Exception as e:  # noqa: BLE001
+                print(f"[WARN] Failed to parse {xml_file.name}: {e}", file=sys.stderr)
+                continue
+            count += 1
+        return count
+
+    # Files are independent and conversion is CPU-bound: one task per file
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futures = {
+            pool.submit(_convert_one, f, out_path, table_format): f
+            for out_path, f in jobs.items()
+        }
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+            except Exception as e:  # noqa: BLE001
+                print(f"[WARN] Failed to parse {futures[fut].name}: {e}", file=sys.stderr)
+                continue
+            count += 1
     return count
 
 
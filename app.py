@@ -8,9 +8,22 @@ from flask import Flask, jsonify, request, make_response
 
 from query_runner import run_global_query
 
+try:  # optional: much faster than Flask's json.dumps on large citation payloads
+    import orjson  # type: ignore
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
 app = Flask(__name__)
 
 
+def _json_response(payload: Dict[str, Any], status: int):
+    """Serialize with orjson when installed, else fall back to jsonify."""
+    if orjson is None:
+        return jsonify(payload), status
+    body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY)
+    return app.response_class(body, mimetype="application/json"), status
+
+
 @app.get("/health")
 def health() -> tuple[dict[str, str], int]:
     return {"status": "ok"}, 200
@@ -61,21 +74,32 @@ def query_endpoint():
             dynamic_community_selection=bool(dynamic),
             response_type="multiple_paragraphs",
             verbose=bool(os.environ.get("GRAPHRAG_QUERY_VERBOSE")),
+            # only safe to reuse loops on long-lived pool threads (waitress)
+            persistent_loop=bool(app.config.get("PERSISTENT_EVENT_LOOP")),
         )
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    return jsonify(
+    return _json_response(
         {
             "answer": result.answer,
             "citations": result.citations.get("reports", []),
             "run_dir": result.run_dir,
-        }
-    ), 200
+        },
+        200,
+    )
 
 
 if __name__ == "__main__":
     # Bind to localhost by default. Customize via env if needed.
     host = os.environ.get("HOST", "127.0.0.1")
     port = int(os.environ.get("PORT", "5000"))
-    app.run(host=host, port=port)
+    try:
+        from waitress import serve
+    except ImportError:
+        # Werkzeug dev server (not for production use)
+        app.run(host=host, port=port)
+    else:
+        app.config["PERSISTENT_EVENT_LOOP"] = True
+        # Threaded WSGI server so slow queries don't block other requests
+        serve(app, host=host, port=port, threads=int(os.environ.get("THREADS", "8")))
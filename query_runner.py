@@ -13,12 +13,18 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import atexit
 import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Optional
 
 import pandas as pd
+import pyarrow.parquet as pq
+from pandas.api.types import is_numeric_dtype
 import sys
 
 # Ensure local graphrag package is importable when running from repo root
@@ -48,8 +54,18 @@ except Exception:  # pragma: no cover
 # -----------------------------
 
 
+# Tables required by global search (stored as <name>.parquet in a run dir)
+_GLOBAL_TABLES = ("entities", "communities", "community_reports")
+
+
 def _find_root_dir(start: Path | str) -> Path:
     """Find the repository root by searching upward for a settings.yaml file."""
+    # abspath is a string operation; the realpath + upward walk is memoized
+    return _find_root_dir_cached(os.path.abspath(start))
+
+
+@lru_cache(maxsize=8)
+def _find_root_dir_cached(start: str) -> Path:
     cur = Path(start).resolve()
     for p in [cur, *cur.parents]:
         if (p / "settings.yaml").exists() or (p / "settings.yml").exists():
@@ -58,6 +74,16 @@ def _find_root_dir(start: Path | str) -> Path:
     return cur
 
 
+def _same_path(a: Path | str, b: Path | str) -> bool:
+    """Compare paths by normalized string, falling back to samefile (no realpath)."""
+    if os.path.normpath(a) == os.path.normpath(b):
+        return True
+    try:
+        return os.path.samefile(a, b)
+    except OSError:  # either path missing
+        return False
+
+
 def _looks_like_timestamp_dir(name: str) -> bool:
     # Accept a few common patterns without being too strict
     # e.g. 2025-09-08_14-53-13, 20250908-145313, 2025-09-08-145313
@@ -83,14 +109,16 @@ def _select_latest_run_dir(root: Path, config: GraphRagConfig) -> Path:
     if not output_root.exists():
         return output_root  # likely a new run or custom path; return as-is
 
+    # scandir yields the entry type without an extra stat per child
     candidates: list[tuple[float, Path]] = []
-    for child in output_root.iterdir():
-        if child.is_dir() and (_looks_like_timestamp_dir(child.name) or True):
-            if _dir_has_minimum_tables(child):
-                candidates.append((child.stat().st_mtime, child))
+    with os.scandir(output_root) as entries:
+        for entry in entries:
+            if entry.is_dir() and (_looks_like_timestamp_dir(entry.name) or True):
+                child = Path(entry.path)
+                if _dir_has_minimum_tables(child):
+                    candidates.append((entry.stat().st_mtime, child))
     if candidates:
-        candidates.sort(key=lambda x: x[0], reverse=True)
-        return candidates[0][1]
+        return max(candidates, key=lambda x: x[0])[1]
 
     # Nothing matched; return configured base or output_root
     return out_cfg.base_dir if out_cfg is not None else output_root
@@ -98,24 +126,161 @@ def _select_latest_run_dir(root: Path, config: GraphRagConfig) -> Path:
 
 def _dir_has_minimum_tables(path: Path) -> bool:
     # Check for at least the required Parquet files for global search
-    required = {"entities.parquet", "communities.parquet", "community_reports.parquet"}
-    try:
-        present = {p.name for p in path.iterdir() if p.is_file()}
-    except FileNotFoundError:
-        return False
-    return required.issubset(present)
-
-
-async def _load_global_tables(config: GraphRagConfig) -> dict[str, pd.DataFrame]:
+    return all((path / f"{n}.parquet").is_file() for n in _GLOBAL_TABLES)
+
+
+# community_reports columns used by global search; skips the bulky findings,
+# full_content_json and rating_explanation columns
+_REPORT_COLUMNS = (
+    "id",
+    "human_readable_id",
+    "community",
+    "level",
+    "parent",
+    "children",
+    "title",
+    "summary",
+    "full_content",
+    "rank",
+    "period",
+    "size",
+)
+
+
+def _read_reports_projected(path: Path) -> pd.DataFrame:
+    """Read community_reports.parquet decoding only the columns search needs."""
+    present = set(pq.read_schema(path).names)
+    columns = [c for c in _REPORT_COLUMNS if c in present]
+    return pq.read_table(path, columns=columns).to_pandas()
+
+
+async def _load_global_tables(
+    config: GraphRagConfig, run_dir: Path | str
+) -> dict[str, pd.DataFrame]:
     """Load the minimal set of tables for global search via configured storage."""
     storage = create_storage_from_config(config.output)
-    names = ["entities", "communities", "community_reports"]
     dfs: dict[str, pd.DataFrame] = {}
-    for n in names:
-        dfs[n] = await load_table_from_storage(name=n, storage=storage)
+    for n in _GLOBAL_TABLES:
+        reports_path = Path(run_dir) / f"{n}.parquet"
+        if (
+            n == "community_reports"
+            and getattr(config.output, "type", None) == "file"
+            and reports_path.is_file()
+        ):
+            # Local file storage: project columns with pyarrow instead of
+            # materializing the whole table through pandas
+            dfs[n] = _read_reports_projected(reports_path)
+        else:
+            dfs[n] = await load_table_from_storage(name=n, storage=storage)
     return dfs
 
 
+# -----------------------------
+# Caching (config + tables are identical across queries until re-indexing)
+# -----------------------------
+
+
+def _settings_stamp(root_dir: Path) -> int:
+    """mtime of the settings file, used to invalidate the cached config."""
+    for name in ("settings.yaml", "settings.yml"):
+        try:
+            return (root_dir / name).stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+    return 0
+
+
+def _tables_stamp(run_dir: Path | str) -> int:
+    """Newest mtime of the global-search tables; 0 if they are not on local disk."""
+    try:
+        return max(
+            (Path(run_dir) / f"{n}.parquet").stat().st_mtime_ns for n in _GLOBAL_TABLES
+        )
+    except OSError:
+        return 0
+
+
+@lru_cache(maxsize=4)
+def _load_config_cached(
+    root_dir: Path, overrides: tuple[tuple[str, Any], ...], stamp: int
+) -> GraphRagConfig:
+    """load_config memoized on (root, overrides, settings mtime)."""
+    return load_config(root_dir=root_dir, cli_overrides=dict(overrides) or None)
+
+
+def _load_config(root_dir: Path, overrides: dict[str, Any] | None = None) -> GraphRagConfig:
+    key = tuple(sorted((overrides or {}).items()))
+    return _load_config_cached(root_dir, key, _settings_stamp(root_dir))
+
+
+# Loaded tables keyed on (run_dir, newest table mtime); oldest entries evicted first.
+# Cached frames are shared across requests and must be treated as read-only.
+_TABLES_CACHE: OrderedDict[tuple[str, int], dict[str, pd.DataFrame]] = OrderedDict()
+_TABLES_CACHE_SIZE = 4
+_TABLES_CACHE_LOCK = threading.Lock()
+
+
+async def _get_global_tables(
+    config: GraphRagConfig, run_dir: Path | str
+) -> dict[str, pd.DataFrame]:
+    """Return the global-search tables for run_dir, loading them on a cache miss.
+
+    Tables that aren't on local disk (no mtime to validate against) are never cached.
+    """
+    stamp = _tables_stamp(run_dir)
+    key = (str(run_dir), stamp)
+    if stamp:
+        with _TABLES_CACHE_LOCK:
+            dfs = _TABLES_CACHE.get(key)
+            if dfs is not None:
+                _TABLES_CACHE.move_to_end(key)
+                return dfs
+
+    dfs = await _load_global_tables(config, run_dir)
+    if stamp:
+        with _TABLES_CACHE_LOCK:
+            _TABLES_CACHE[key] = dfs
+            while len(_TABLES_CACHE) > _TABLES_CACHE_SIZE:
+                _TABLES_CACHE.popitem(last=False)
+    return dfs
+
+
+_thread_state = threading.local()
+_thread_loops: list[asyncio.AbstractEventLoop] = []
+_thread_loops_lock = threading.Lock()
+
+
+def _run_on_thread_loop(coro: Any) -> Any:
+    """Run a coroutine on this thread's persistent event loop.
+
+    Avoids asyncio.run's loop setup/teardown on every query. Only worth it on
+    long-lived worker threads (the waitress pool); each keeps its own loop so
+    concurrent requests don't contend for one. Loops are closed at exit.
+    """
+    loop = getattr(_thread_state, "loop", None)
+    if loop is None or loop.is_closed():
+        loop = asyncio.new_event_loop()
+        _thread_state.loop = loop
+        with _thread_loops_lock:
+            _thread_loops.append(loop)
+    return loop.run_until_complete(coro)
+
+
+@atexit.register
+def _close_thread_loops() -> None:
+    with _thread_loops_lock:
+        loops = list(_thread_loops)
+        _thread_loops.clear()
+    for loop in loops:
+        if loop.is_closed():
+            continue
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+
+
 def _top5_reports_only(context_data: dict[str, Any]) -> dict[str, Any]:
     """Return only top-5 community report citations from context_data."""
     reports = context_data.get("reports")
@@ -128,9 +293,17 @@ def _top5_reports_only(context_data: dict[str, Any]) -> dict[str, Any]:
     else:
         df = pd.DataFrame(reports)
 
-    # Sort by rank ascending (best first) if available
+    # Sort by rank ascending (best first) if available. Only 5 rows are kept, so
+    # narrow to the smallest ranks first (ties kept for the id tie-break) rather
+    # than sorting the whole frame.
     if "rank" in df.columns:
-        df_sorted = df.sort_values(by=["rank", "id"], ascending=[True, True])
+        candidates = df
+        if len(df) > 5 and is_numeric_dtype(df["rank"]):
+            smallest = df.nsmallest(5, "rank", keep="all")
+            # nsmallest drops NaN ranks; fall back if that leaves too few rows
+            if len(smallest) >= 5:
+                candidates = smallest
+        df_sorted = candidates.sort_values(by=["rank", "id"], ascending=[True, True])
     else:
         df_sorted = df
 
@@ -164,28 +337,28 @@ def run_global_query(
     dynamic_community_selection: bool = True,
     response_type: str = "multiple_paragraphs",
     verbose: bool = False,
+    persistent_loop: bool = False,
 ) -> QueryResult:
-    """Execute a global search against the latest run and return trimmed citations."""
+    """Execute a global search against the latest run and return trimmed citations.
+
+    persistent_loop reuses a per-thread event loop instead of asyncio.run; only
+    enable it from long-lived worker threads (see app.py).
+    """
     root_dir = _find_root_dir(root or Path.cwd())
 
     # Load base config
-    base_config = load_config(root_dir=root_dir)
+    base_config = _load_config(root_dir)
 
     # Select latest run dir and (if different) override output.base_dir
     run_dir = _select_latest_run_dir(root_dir, base_config)
     overrides: dict[str, Any] = {}
     if getattr(base_config.output, "base_dir", None):
-        abs_base = (root_dir / base_config.output.base_dir).resolve()
-        if abs_base != Path(run_dir).resolve():
+        if not _same_path(root_dir / base_config.output.base_dir, run_dir):
             overrides["output.base_dir"] = str(run_dir)
 
-    config = load_config(root_dir=root_dir, cli_overrides=overrides or None)
-
-    # Load minimal tables
-    dfs = asyncio.run(_load_global_tables(config))
+    config = _load_config(root_dir, overrides) if overrides else base_config
 
     # Capture context via callbacks
-    full_response = ""
     context_data: dict[str, Any] = {}
 
     def on_context(ctx: Any) -> None:
@@ -195,9 +368,12 @@ def run_global_query(
     callbacks = NoopQueryCallbacks()
     callbacks.on_context = on_context
 
-    # Execute search (non-streaming for simplicity)
-    answer, _ctx = asyncio.run(
-        api.global_search(
+    async def _run() -> str:
+        # Load minimal tables (cached until the run's tables change)
+        dfs = await _get_global_tables(config, run_dir)
+
+        # Execute search (non-streaming for simplicity)
+        answer, _ctx = await api.global_search(
             config=config,
             entities=dfs["entities"],
             communities=dfs["communities"],
@@ -209,8 +385,12 @@ def run_global_query(
             callbacks=[callbacks],
             verbose=verbose,
         )
-    )
-    full_response = answer
+        return answer
+
+    if persistent_loop:
+        full_response = _run_on_thread_loop(_run())
+    else:
+        full_response = asyncio.run(_run())
 
     # Trim citations: community reports only, top-5 by rank
     citations = _top5_reports_only(context_data)
@@ -1,10 +1,28 @@
 from __future__ import annotations
 
 import argparse
+from itertools import repeat
 from pathlib import Path
 import sys
 
 import pandas as pd
+import pyarrow.parquet as pq
+
+# Columns plot_umap may use (coordinates, label score, label text)
+_ENTITY_COLUMNS = (
+    "x",
+    "y",
+    "umap_x",
+    "umap_y",
+    "umapX",
+    "umapY",
+    "degree",
+    "count",
+    "rank",
+    "title",
+    "name",
+    "id",
+)
 
 
 def find_project_root(start: Path | str) -> Path:
@@ -19,7 +37,9 @@ def load_entities(output_dir: Path) -> pd.DataFrame:
     entities_path = output_dir / "entities.parquet"
     if not entities_path.exists():
         raise FileNotFoundError(f"Missing {entities_path}. Re-run indexing first.")
-    return pd.read_parquet(entities_path)
+    present = set(pq.read_schema(entities_path).names)
+    columns = [c for c in _ENTITY_COLUMNS if c in present]
+    return pd.read_parquet(entities_path, engine="pyarrow", columns=columns, use_threads=True)
 
 
 def resolve_xy_columns(df: pd.DataFrame) -> tuple[str, str]:
@@ -34,10 +54,22 @@ def resolve_xy_columns(df: pd.DataFrame) -> tuple[str, str]:
 
 
 def plot_umap(df: pd.DataFrame, x_col: str, y_col: str, output_file: Path, label_top: int = 0) -> None:
-    import matplotlib.pyplot as plt  # lazy import
-
-    plt.figure(figsize=(8, 6), dpi=150)
-    plt.scatter(df[x_col], df[y_col], s=8, c="#2563eb", alpha=0.6, linewidths=0)
+    import matplotlib  # lazy import
+
+    matplotlib.use("Agg")  # file output only; never pick an interactive backend
+    import matplotlib.pyplot as plt
+
+    fig = plt.figure(figsize=(8, 6), dpi=150)
+    # Rasterized: many points render as one bitmap instead of per-point paths
+    plt.scatter(
+        df[x_col].to_numpy(),
+        df[y_col].to_numpy(),
+        s=8,
+        c="#2563eb",
+        alpha=0.6,
+        linewidths=0,
+        rasterized=True,
+    )
     plt.title("GraphRAG UMAP (entities)")
     plt.xlabel(x_col)
     plt.ylabel(y_col)
@@ -52,13 +84,21 @@ def plot_umap(df: pd.DataFrame, x_col: str, y_col: str, output_file: Path, label
                 break
         if score_col is not None:
             top = df.sort_values(by=score_col, ascending=False).head(label_top)
-            for _, row in top.iterrows():
-                label = str(row.get("title") or row.get("name") or row.get("id"))
-                plt.text(row[x_col], row[y_col], label, fontsize=6, alpha=0.8)
+            # Pull plain arrays once instead of building a Series per row
+            xs = top[x_col].to_numpy()
+            ys = top[y_col].to_numpy()
+            label_cols = [
+                top[c].to_numpy() if c in top.columns else repeat(None)
+                for c in ("title", "name", "id")
+            ]
+            ax = plt.gca()
+            for x, y, title, name, id_ in zip(xs, ys, *label_cols):
+                ax.text(x, y, str(title or name or id_), fontsize=6, alpha=0.8)
 
     output_file.parent.mkdir(parents=True, exist_ok=True)
     plt.savefig(output_file)
     # Do not plt.show() by default to keep it non-blocking
+    plt.close(fig)
 
 
 def main(argv: list[str] | None = None) -> int: